@@ -1,149 +1,95 @@
 import logging
-import json
-from datetime import datetime
-from pathlib import Path
-from typing import Optional
-
-from dotenv import load_dotenv
+from types import MappingProxyType
+from typing import Optional, Union
 
 from livekit.agents import (
     Agent,
-    AgentSession,
     JobContext,
-    JobProcess,
-    MetricsCollectedEvent,
-    RoomInputOptions,
+    RunContext,
     WorkerOptions,
     cli,
-    metrics,
-    tokenize,
     function_tool,
-    RunContext,
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+from tutor_common import (
+    CONTENT_PATH,
+    Mode,
+    TutorContent,
+    build_tutor_content,
+    current_tutor_content,
+    load_env,
+    parse_mode,
+)
+from tutor_session import TTSCache, make_tts_for_mode, prewarm, run_tutor_session
 
 # ----------------------------------------------------
 # Setup & shared content
 # ----------------------------------------------------
 
 logger = logging.getLogger("agent")
-load_dotenv(".env.local")
-
-CONTENT_PATH = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
-
-
-def _default_tutor_content() -> list[dict]:
-    """Fallback content if JSON file is missing or invalid."""
-    return [
-        {
-            "id": "variables",
-            "title": "Variables",
-            "summary": "Variables store values so you can reuse them later. Think of them as labeled boxes that hold data like numbers or text.",
-            "sample_question": "What is a variable and why is it useful?",
-        },
-        {
-            "id": "loops",
-            "title": "Loops",
-            "summary": "Loops let you repeat an action multiple times without copying code, like running something for each item in a list.",
-            "sample_question": "Explain the difference between a for loop and a while loop.",
-        },
-    ]
-
-
-def load_tutor_content() -> list[dict]:
-    """Load course concepts from JSON, with safe fallback."""
-    if not CONTENT_PATH.exists():
-        logger.warning("Tutor content file not found at %s, using defaults", CONTENT_PATH)
-        return _default_tutor_content()
-
-    try:
-        with CONTENT_PATH.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            raise ValueError("Content JSON must be a list of concepts")
-        return data
-    except Exception as e:
-        logger.warning("Failed to read tutor content JSON (%s), using defaults", e)
-        return _default_tutor_content()
-
-
-def make_tts_for_mode(mode: str) -> murf.TTS:
-    """Return the correct Murf Falcon voice for a given mode."""
-    mode = mode.lower().strip()
-    voice_id = "Matthew"
-
-    if mode == "quiz":
-        voice_id = "Alicia"
-    elif mode == "teach_back":
-        voice_id = "Ken"
-    else:
-        voice_id = "Matthew"  # learn / default
-
-    return murf.TTS(
-        voice=voice_id,
-        style="Conversation",
-        tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-        text_pacing=True,
+load_env()
+
+
+# Fallback content if JSON file is missing or invalid
+DEFAULT_TUTOR_CONTENT: TutorContent = build_tutor_content(
+    (
+        MappingProxyType(
+            {
+                "id": "variables",
+                "title": "Variables",
+                "summary": "Variables store values so you can reuse them later. Think of them as labeled boxes that hold data like numbers or text.",
+                "sample_question": "What is a variable and why is it useful?",
+            }
+        ),
+        MappingProxyType(
+            {
+                "id": "loops",
+                "title": "Loops",
+                "summary": "Loops let you repeat an action multiple times without copying code, like running something for each item in a list.",
+                "sample_question": "Explain the difference between a for loop and a while loop.",
+            }
+        ),
     )
+)
 
 
-# ----------------------------------------------------
-# Single TutorAgent class with 3 modes + handoffs
-# ----------------------------------------------------
-
-
-class TutorAgent(Agent):
+def tutor_content_or_default() -> TutorContent:
     """
-    Day 4 – Teach-the-Tutor: Active Recall Coach
-
-    Modes:
-      - learn      → explains a concept (Murf Falcon: Matthew)
-      - quiz       → asks questions (Murf Falcon: Alicia)
-      - teach_back → user explains; agent gives feedback (Murf Falcon: Ken)
+    Load course concepts, with safe fallback.
 
-    This class is instantiated with a specific (mode, concept_id).
-    Switching modes returns a NEW instance via a tool → triggers agent handoff.
+    Parsing and indexing (by-id map, prompt concept list) are cached in
+    `tutor_common` until the JSON file changes, so every handoff reuses them.
     """
+    content = current_tutor_content()
+    if content is None or not content.concepts:
+        logger.warning("No tutor content at %s, using defaults", CONTENT_PATH)
+        return DEFAULT_TUTOR_CONTENT
+    return content
 
-    def __init__(
-        self,
-        mode: str = "intro",
-        concept_id: Optional[str] = None,
-    ) -> None:
-        self.mode = mode.strip().lower()
-        concepts = load_tutor_content()
-        self.concepts_by_id = {c["id"]: c for c in concepts}
 
-        # Choose default concept if none given
-        if concept_id is None and concepts:
-            concept_id = concepts[0]["id"]
-        self.concept_id = concept_id
+# Modes the LLM may hand off to via `switch_mode`
+_SWITCHABLE_MODES = frozenset({Mode.LEARN, Mode.QUIZ, Mode.TEACH_BACK})
 
-        concept_list_text = "\n".join(
-            f"- id: {c['id']} | title: {c['title']}"
-            for c in concepts
-        ) or "None (no concepts defined)."
 
-        # Safe lookup for current concept
-        concept = self.concepts_by_id.get(self.concept_id) if self.concept_id else None
-        concept_title = concept["title"] if concept else "Unknown concept"
-        concept_summary = concept["summary"] if concept else ""
-        concept_question = concept.get("sample_question", "") if concept else ""
+# ----------------------------------------------------
+# Instruction prompt pieces (built once at import)
+# ----------------------------------------------------
 
-        # Different behavior hints per mode
-        if self.mode == "learn":
-            persona = "You are Matthew, a calm explainer."
-            mode_instructions = """
+# mode -> (persona, mode_instructions)
+_MODE_BLOCKS: dict[Mode, tuple[str, str]] = {
+    Mode.LEARN: (
+        "You are Matthew, a calm explainer.",
+        """
 LEARN MODE:
 - Explain the current concept clearly using the summary from content.
 - Break explanation into 2–3 short chunks.
 - After each chunk, ask a quick check like: "Does that make sense?" or "Should I give an example?".
 - Keep it concise and interactive.
-"""
-        elif self.mode == "quiz":
-            persona = "You are Alicia, a friendly quiz master."
-            mode_instructions = """
+""",
+    ),
+    Mode.QUIZ: (
+        "You are Alicia, a friendly quiz master.",
+        """
 QUIZ MODE:
 - Ask ONE question at a time about the current concept.
 - Use the sample_question as a starting point, then vary it.
@@ -151,10 +97,11 @@ QUIZ MODE:
   - What they got right.
   - What is missing or slightly off.
 - Stay encouraging; you can ask simple follow-ups.
-"""
-        elif self.mode == "teach_back":
-            persona = "You are Ken, a thoughtful coach."
-            mode_instructions = """
+""",
+    ),
+    Mode.TEACH_BACK: (
+        "You are Ken, a thoughtful coach.",
+        """
 TEACH_BACK MODE:
 - Ask the user to explain the current concept in their own words.
 - Let them talk and finish.
@@ -163,11 +110,12 @@ TEACH_BACK MODE:
   - 1–2 gaps or suggestions for improvement.
 - Give a simple mastery score 1–5.
 - Encourage them that teaching back is part of learning.
-"""
-        else:
-            # Intro / neutral mode
-            persona = "You are a neutral tutor orchestrator."
-            mode_instructions = """
+""",
+    ),
+    # Intro / neutral mode
+    Mode.INTRO: (
+        "You are a neutral tutor orchestrator.",
+        """
 INTRO MODE:
 - Greet the user briefly.
 - Explain that you are an active recall tutor with three modes:
@@ -179,24 +127,26 @@ INTRO MODE:
   1) Which concept id they want to study.
   2) Which mode they want: learn, quiz, or teach_back.
 - Then call the `switch_mode` tool with the chosen mode + concept_id.
-"""
+""",
+    ),
+}
 
-        instructions = f"""
+_INSTRUCTIONS_TEMPLATE = """
 You are an ACTIVE RECALL PROGRAMMING TUTOR.
 
 Personality:
 {persona}
 
 AVAILABLE CONCEPTS (from JSON):
-{concept_list_text}
+{concept_list}
 
 Current concept:
-- id: {self.concept_id}
-- title: {concept_title}
-- summary: {concept_summary}
-- sample_question: {concept_question}
+- id: {concept_id}
+- title: {title}
+- summary: {summary}
+- sample_question: {sample_question}
 
-CURRENT MODE: {self.mode.upper()}
+CURRENT MODE: {mode_upper}
 
 {mode_instructions}
 
@@ -216,9 +166,95 @@ TOOLS:
    It will create a new specialized tutor instance with the right voice.
 """
 
+# Short mode-specific greeting used by `on_enter`
+_ENTER_PROMPTS: dict[Mode, str] = {
+    Mode.INTRO: (
+        "Greet the user, explain the three modes and available concepts, "
+        "then ask which concept and mode they want to start with."
+    ),
+    Mode.LEARN: (
+        "Briefly greet the user as Matthew and start explaining the current concept in one or two sentences, "
+        "then ask if they'd like more detail or an example."
+    ),
+    Mode.QUIZ: (
+        "Introduce yourself as Alicia and ask one quiz question about the current concept."
+    ),
+    Mode.TEACH_BACK: (
+        "Introduce yourself as Ken and ask the user to explain the current concept "
+        "in their own words."
+    ),
+}
+
+
+# ----------------------------------------------------
+# Single TutorAgent class with 3 modes + handoffs
+# ----------------------------------------------------
+
+
+class TutorAgent(Agent):
+    """
+    Day 4 – Teach-the-Tutor: Active Recall Coach
+
+    Modes:
+      - learn      → explains a concept (Murf Falcon: Matthew)
+      - quiz       → asks questions (Murf Falcon: Alicia)
+      - teach_back → user explains; agent gives feedback (Murf Falcon: Ken)
+
+    This class is instantiated with a specific (mode, concept_id).
+    Switching modes returns a NEW instance via a tool → triggers agent handoff.
+    All instances of one session share `tts_cache`, so each voice is built once
+    per session.
+    """
+
+    def __init__(
+        self,
+        mode: Union[Mode, str] = Mode.INTRO,
+        concept_id: Optional[str] = None,
+        tts_cache: Optional[TTSCache] = None,
+    ) -> None:
+        # Mode values pass straight through; raw strings ("Learn") are parsed,
+        # and anything unparseable falls back to intro as before
+        if isinstance(mode, Mode):
+            self.mode = mode
+        else:
+            try:
+                self.mode = parse_mode(mode)
+            except ValueError:
+                self.mode = Mode.INTRO
+        self._tts_cache = tts_cache if tts_cache is not None else {}
+        content = tutor_content_or_default()
+        self.concepts_by_id = content.by_id
+
+        # Choose default concept if none given
+        if concept_id is None and content.concepts:
+            concept_id = content.concepts[0]["id"]
+        self.concept_id = concept_id
+
+        # Safe lookup for current concept (one lookup, one None check)
+        concept = self.concepts_by_id.get(self.concept_id) if self.concept_id else None
+        concept_title, concept_summary, concept_question = (
+            (concept["title"], concept["summary"], concept.get("sample_question", ""))
+            if concept
+            else ("Unknown concept", "", "")
+        )
+
+        # Different behavior hints per mode
+        persona, mode_instructions = _MODE_BLOCKS[self.mode]
+
+        instructions = _INSTRUCTIONS_TEMPLATE.format(
+            persona=persona,
+            concept_list=content.concept_list_text,
+            concept_id=self.concept_id,
+            title=concept_title,
+            summary=concept_summary,
+            sample_question=concept_question,
+            mode_upper=self.mode.upper(),
+            mode_instructions=mode_instructions,
+        )
+
         # Choose TTS per mode (Murf Falcon voices)
         # Intro uses Matthew by default
-        tts_plugin = make_tts_for_mode(self.mode if self.mode != "intro" else "learn")
+        tts_plugin = make_tts_for_mode(self.mode, self._tts_cache)
 
         super().__init__(
             instructions=instructions,
@@ -230,30 +266,7 @@ TOOLS:
         Called when this TutorAgent instance becomes active (after handoff).
         We give a short mode-specific greeting prompt.
         """
-        if self.mode == "intro":
-            prompt = (
-                "Greet the user, explain the three modes and available concepts, "
-                "then ask which concept and mode they want to start with."
-            )
-        elif self.mode == "learn":
-            prompt = (
-                "Briefly greet the user as Matthew and start explaining the current concept in one or two sentences, "
-"then ask if they'd like more detail or an example."
-
-            )
-        elif self.mode == "quiz":
-            prompt = (
-                "Introduce yourself as Alicia and ask one quiz question about the current concept."
-            )
-        elif self.mode == "teach_back":
-            prompt = (
-                "Introduce yourself as Ken and ask the user to explain the current concept "
-                "in their own words."
-            )
-        else:
-            prompt = "Greet the user and ask how they want to study."
-
-        await self.session.generate_reply(instructions=prompt)
+        await self.session.generate_reply(instructions=_ENTER_PROMPTS[self.mode])
 
     # ---------------- Tool: switch_mode → handoff ----------------
 
@@ -272,8 +285,12 @@ TOOLS:
             mode: "learn", "quiz", or "teach_back".
             concept_id: Optional concept id. If omitted, keeps current concept.
         """
-        mode = mode.strip().lower()
-        if mode not in {"learn", "quiz", "teach_back"}:
+        # The one place a mode string from the LLM is normalized
+        try:
+            parsed_mode = parse_mode(mode)
+        except ValueError:
+            parsed_mode = None
+        if parsed_mode not in _SWITCHABLE_MODES:
             raise ValueError("mode must be one of: learn, quiz, teach_back")
 
         if concept_id is None:
@@ -285,13 +302,16 @@ TOOLS:
                 f"Valid ids: {', '.join(self.concepts_by_id.keys())}"
             )
 
-        logger.info("Handoff: switching to mode=%s, concept=%s", mode, concept_id)
+        logger.info(
+            "Handoff: switching to mode=%s, concept=%s", parsed_mode, concept_id
+        )
 
         # IMPORTANT: returning a new Agent → AGENT HANDOFF (per docs)
         # We are NOT passing chat_ctx here to avoid the session access error.
         return TutorAgent(
-            mode=mode,
+            mode=parsed_mode,
             concept_id=concept_id,
+            tts_cache=self._tts_cache,
         )
 
 
@@ -300,54 +320,17 @@ TOOLS:
 # ----------------------------------------------------
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
-
-
 async def entrypoint(ctx: JobContext):
-    ctx.log_context_fields = {
-        "room": ctx.room.name,
-    }
-
-    session = AgentSession(
-        # STT
-        stt=deepgram.STT(model="nova-3"),
-        # LLM
-        llm=google.LLM(
-            model="gemini-2.5-flash",
-        ),
-        # Default TTS (will be overridden by TutorAgent’s own tts)
-        tts=make_tts_for_mode("learn"),
-        # Turn detection / VAD
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
+    # TTS instances are scoped to this job and shared by its handoffs
+    tts_cache: TTSCache = {}
+    await run_tutor_session(
+        ctx,
+        # Start in INTRO mode so it asks for mode + concept first
+        agent=TutorAgent(mode=Mode.INTRO, concept_id=None, tts_cache=tts_cache),
+        # Session default TTS: the same cached Matthew voice the intro agent uses
+        tts=make_tts_for_mode(Mode.LEARN, tts_cache),
     )
 
-    usage_collector = metrics.UsageCollector()
-
-    @session.on("metrics_collected")
-    def _on_metrics_collected(ev: MetricsCollectedEvent):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
-
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
-
-    ctx.add_shutdown_callback(log_usage)
-
-    # Start in INTRO mode so it asks for mode + concept first
-    await session.start(
-        agent=TutorAgent(mode="intro", concept_id=None),
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
-
-    await ctx.connect()
-
 
 if __name__ == "__main__":
     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
@@ -1,107 +1,45 @@
 import logging
 import os
 
-from dotenv import load_dotenv
-
-from livekit.agents import (
-    AgentSession,
-    JobContext,
-    JobProcess,
-    RoomInputOptions,
-    WorkerOptions,
-    cli,
-    metrics,
-    tokenize,
-)
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.agents import JobContext, WorkerOptions, cli
 
 from agent_learn import LearnAgent
 from agent_quiz import QuizAgent
 from agent_teachback import TeachBackAgent
+from tutor_common import Mode, load_env, parse_mode
+from tutor_session import make_tts_for_mode, prewarm, run_tutor_session
 
 logger = logging.getLogger("router")
-load_dotenv(".env.local")
+load_env()
 
 
-# Decide which agent + which Murf voice to use
-def build_agent_for_mode(mode: str):
-    mode = mode.lower().strip()
+_AGENT_CTOR_BY_MODE = {
+    Mode.LEARN: LearnAgent,
+    Mode.QUIZ: QuizAgent,
+    Mode.TEACH_BACK: TeachBackAgent,
+}
 
-    if mode == "learn":
-        # Murf Falcon Matthew
-        return LearnAgent(), murf.TTS(
-            voice="Matthew",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-
-    elif mode == "quiz":
-        # Murf Falcon Alicia
-        return QuizAgent(), murf.TTS(
-            voice="Alicia",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
 
-    elif mode == "teach_back":
-        # Murf Falcon Ken
-        return TeachBackAgent(), murf.TTS(
-            voice="Ken",
-            style="Conversation",
-            tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-            text_pacing=True,
-        )
-
-    else:
+def _build_agent(mode: Mode):
+    agent_cls = _AGENT_CTOR_BY_MODE.get(mode)
+    if agent_cls is None:
         raise ValueError(f"Unknown mode: {mode}")
+    return agent_cls()
 
 
-def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+# Decide which agent + which Murf voice to use
+def build_agent_for_mode(mode: Mode):
+    return _build_agent(mode), make_tts_for_mode(mode)
 
 
 async def entrypoint(ctx: JobContext):
     # ✅ Read mode from ENV instead of ctx.job.vars (which crashes in dev)
-    mode = os.getenv("TUTOR_MODE", "learn")  # default: learn
-    logger.info(f"[Router] Starting in mode: {mode}")
+    # Normalized once here; unknown values raise before anything is built
+    mode = parse_mode(os.getenv("TUTOR_MODE", "learn"))  # default: learn
+    logger.info("[Router] Starting in mode: %s", mode)
 
     agent, tts_model = build_agent_for_mode(mode)
-
-    session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=google.LLM(model="gemini-2.5-flash"),
-        tts=tts_model,
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
-        preemptive_generation=True,
-    )
-
-    # optional metrics collection
-    usage_collector = metrics.UsageCollector()
-
-    @session.on("metrics_collected")
-    def _on_metrics(ev):
-        metrics.log_metrics(ev.metrics)
-        usage_collector.collect(ev.metrics)
-
-    async def log_usage():
-        summary = usage_collector.get_summary()
-        logger.info(f"Usage: {summary}")
-
-    ctx.add_shutdown_callback(log_usage)
-
-    await session.start(
-        agent=agent,
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
-
-    await ctx.connect()
+    await run_tutor_session(ctx, agent=agent, tts=tts_model)
 
 
 if __name__ == "__main__":
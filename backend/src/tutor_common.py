@@ -1,35 +1,149 @@
 import json
 import logging
+import os
+import sys
+from collections.abc import Mapping, Sequence
+from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Any, NamedTuple, Optional
+
+from dotenv import load_dotenv
 
 logger = logging.getLogger("tutor")
 
+ENV_FILE = ".env.local"
+_ENV_LOADED_FLAG = "_TUTOR_DOTENV_LOADED"
+
+
+def load_env() -> None:
+    """
+    Load .env.local at most once per process tree.
+
+    Every agent module calls this at import; the flag lives in os.environ so
+    job subprocesses (which inherit the already-loaded environment) skip the
+    re-parse too.
+    """
+    if os.environ.get(_ENV_LOADED_FLAG):
+        return
+    load_dotenv(ENV_FILE)
+    os.environ[_ENV_LOADED_FLAG] = "1"
+
+
+class Mode(str, Enum):
+    """Tutor modes; the values are the names the LLM and TUTOR_MODE use."""
+
+    INTRO = "intro"
+    LEARN = "learn"
+    QUIZ = "quiz"
+    TEACH_BACK = "teach_back"
+
+    def __str__(self) -> str:
+        # Log / prompt as "quiz", not "Mode.QUIZ"
+        return self.value
+
+
+def parse_mode(value: str) -> Mode:
+    """
+    Normalize a raw mode string (tool argument, env var) into a `Mode`.
+
+    Called once where a mode enters the process; everything downstream keys
+    its tables on the enum and never re-normalizes. Raises ValueError for an
+    unknown mode.
+    """
+    return Mode(value.strip().lower())
+
+
 CONTENT_PATH = Path(__file__).parent.parent / "shared-data" / "day4_tutor_content.json"
 
+# Concepts are shared read-only views (see `_freeze_concept`)
+Concept = Mapping[str, Any]
+
+_NO_CONCEPTS: Mapping[str, Concept] = MappingProxyType({})
+
 
-def load_tutor_content() -> List[Dict]:
-    """Load list of concepts from the shared JSON file."""
-    if not CONTENT_PATH.exists():
-        logger.warning(f"Tutor content file not found at {CONTENT_PATH}")
-        return []
+def _freeze_concept(concept: dict[str, Any]) -> Concept:
+    # Interning keeps one copy of each id/title string across content reloads;
+    # the read-only view makes the cached concepts safe to share across sessions.
+    # Missing or non-string values are left as they are.
+    for key in ("id", "title"):
+        value = concept.get(key)
+        if isinstance(value, str):
+            concept[key] = sys.intern(value)
+    return MappingProxyType(concept)
+
+
+class TutorContent(NamedTuple):
+    """One parsed version of the content, with everything derived from it."""
+
+    concepts: tuple[Concept, ...]
+    by_id: Mapping[str, Concept]
+    # "- id: ... | title: ..." block used in the TutorAgent prompt
+    concept_list_text: str
+
+
+def build_tutor_content(concepts: tuple[Concept, ...]) -> TutorContent:
+    """Index `concepts` and render the listings derived from them."""
+    return TutorContent(
+        concepts=concepts,
+        by_id=MappingProxyType({c["id"]: c for c in concepts if "id" in c}),
+        concept_list_text="\n".join(
+            f"- id: {c.get('id')} | title: {c.get('title')}" for c in concepts
+        )
+        or "None (no concepts defined).",
+    )
+
+
+@lru_cache(maxsize=1)
+def _load_tutor_content_cached(mtime_ns: int) -> TutorContent:
+    """Parse + index the content file; keyed on mtime so editing the file invalidates."""
+    data = json.loads(CONTENT_PATH.read_bytes())
+    if not isinstance(data, list):
+        raise ValueError("Content JSON must be a list of concepts")
+
+    return build_tutor_content(tuple(_freeze_concept(c) for c in data))
+
+
+def current_tutor_content() -> Optional[TutorContent]:
+    """The shared content file, parsed once per version; None if unreadable."""
+    try:
+        mtime_ns = CONTENT_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        logger.warning("Tutor content file not found at %s", CONTENT_PATH)
+        return None
+    except OSError as e:
+        logger.error("Failed to read tutor content: %s", e)
+        return None
 
     try:
-        with CONTENT_PATH.open("r") as f:
-            return json.load(f)
+        return _load_tutor_content_cached(mtime_ns)
     except Exception as e:
-        logger.error(f"Failed to read tutor content: {e}")
-        return []
+        logger.error("Failed to read tutor content: %s", e)
+        return None
+
+
+def load_tutor_content() -> tuple[Concept, ...]:
+    """Load concepts from the shared JSON file (parsed once per file version)."""
+    content = current_tutor_content()
+    return content.concepts if content is not None else ()
+
+
+def concepts_by_id() -> Mapping[str, Concept]:
+    """Read-only id -> concept view of the shared content file."""
+    content = current_tutor_content()
+    return content.by_id if content is not None else _NO_CONCEPTS
 
 
-def get_concept_by_id(content: List[Dict], concept_id: str) -> Optional[Dict]:
+def get_concept_by_id(content: Sequence[Concept], concept_id: str) -> Optional[Concept]:
+    """Find a concept in `content` by id (use `concepts_by_id()` for repeated lookups)."""
     for c in content:
         if c.get("id") == concept_id:
             return c
     return None
 
 
-def list_concept_ids_and_titles(content: List[Dict]) -> str:
+def list_concept_ids_and_titles(content: Sequence[Concept]) -> str:
     if not content:
         return "No concepts available."
     return ", ".join(f"{c['id']} ({c['title']})" for c in content)
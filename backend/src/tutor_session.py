@@ -0,0 +1,215 @@
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from typing import Optional
+
+from livekit.agents import (
+    Agent,
+    AgentSession,
+    JobContext,
+    JobProcess,
+    MetricsCollectedEvent,
+    RoomInputOptions,
+    metrics,
+    tokenize,
+    vad,
+)
+from livekit.plugins import deepgram, google, murf, noise_cancellation, silero
+from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+from tutor_common import Mode, current_tutor_content
+
+# ----------------------------------------------------
+# Shared session wiring for all tutor entrypoints
+# ----------------------------------------------------
+
+logger = logging.getLogger("tutor")
+
+STT_MODEL = "nova-3"
+LLM_MODEL = "gemini-2.5-flash"
+
+# Stateless (each synthesis opens its own stream), so one instance serves all voices
+_SENTENCE_TOKENIZER = tokenize.basic.SentenceTokenizer(min_sentence_len=2)
+
+
+# voice -> TTS, one dict per job (see `make_tts`)
+TTSCache = dict[str, murf.TTS]
+
+
+def make_tts(voice: str, cache: Optional[TTSCache] = None) -> murf.TTS:
+    """
+    Return a Murf Falcon TTS for the given voice with the tutor defaults.
+
+    A murf.TTS holds the job's HTTP session and a websocket pool bound to the
+    job's event loop, so it must not outlive the job that created it. Pass the
+    job's `cache` to reuse one instance per voice across that job's handoffs.
+    """
+    if cache is not None and voice in cache:
+        return cache[voice]
+
+    tts = murf.TTS(
+        voice=voice,
+        style="Conversation",
+        tokenizer=_SENTENCE_TOKENIZER,
+        text_pacing=True,
+    )
+    if cache is not None:
+        cache[voice] = tts
+    return tts
+
+
+# Murf Falcon voice per mode; the single source for every entrypoint
+VOICE_BY_MODE: dict[Mode, str] = {
+    Mode.LEARN: "Matthew",
+    Mode.QUIZ: "Alicia",
+    Mode.TEACH_BACK: "Ken",
+    Mode.INTRO: "Matthew",
+}
+
+
+def make_tts_for_mode(mode: Mode, cache: Optional[TTSCache] = None) -> murf.TTS:
+    """Return the correct Murf Falcon voice for a given mode."""
+    return make_tts(VOICE_BY_MODE[mode], cache)
+
+
+def build_session(tts: murf.TTS, vad_model: vad.VAD) -> AgentSession:
+    """
+    Build the AgentSession used by every tutor entrypoint.
+
+    STT / LLM / turn detection are configured here once so the entrypoints
+    only differ in the agent and voice they start with.
+    """
+    return AgentSession(
+        stt=deepgram.STT(model=STT_MODEL),
+        llm=google.LLM(model=LLM_MODEL),
+        tts=tts,
+        # Built per job: the turn detector binds to the job's inference executor
+        turn_detection=MultilingualModel(),
+        vad=vad_model,
+        preemptive_generation=True,
+    )
+
+
+# ----------------------------------------------------
+# Metrics: collect per event, log in batches off the loop
+# ----------------------------------------------------
+
+METRICS_FLUSH_INTERVAL = 5.0  # seconds
+METRICS_BUFFER_SIZE = 4096
+
+
+def _log_metrics_batch(batch: list) -> None:
+    for m in batch:
+        metrics.log_metrics(m)
+
+
+class BufferedMetricsLogger:
+    """
+    Feeds every metrics event into a UsageCollector (cheap, stays on the
+    event loop), but defers `metrics.log_metrics` to a background task that
+    logs the buffered batch from a worker thread every `flush_interval`
+    seconds, so log formatting/I/O never runs inside the audio pipeline.
+    """
+
+    def __init__(self, flush_interval: float = METRICS_FLUSH_INTERVAL) -> None:
+        self.usage = metrics.UsageCollector()
+        self._pending: deque = deque(maxlen=METRICS_BUFFER_SIZE)
+        self._flush_interval = flush_interval
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def collect(self, ev: MetricsCollectedEvent) -> None:
+        self.usage.collect(ev.metrics)
+        if self._closed:
+            # Late events after shutdown: nothing will flush them, log inline
+            metrics.log_metrics(ev.metrics)
+            return
+
+        self._pending.append(ev.metrics)
+
+        # Started lazily: the handler is first called from inside the loop
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch = list(self._pending)
+        self._pending.clear()
+        try:
+            await asyncio.to_thread(_log_metrics_batch, batch)
+        except Exception:
+            # Drop this batch but keep the periodic flush alive
+            logger.exception("Failed to log metrics batch")
+
+    async def aclose(self) -> None:
+        """Stop the periodic flush and drain whatever is still buffered."""
+        self._closed = True
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+
+def attach_usage_metrics(session: AgentSession, ctx: JobContext) -> None:
+    """Log session metrics in batches and the usage summary at shutdown."""
+    buffered = BufferedMetricsLogger()
+    session.on("metrics_collected", buffered.collect)
+
+    async def log_usage():
+        # Final drain so nothing buffered is lost when the job ends
+        await buffered.aclose()
+        summary = buffered.usage.get_summary()
+        await asyncio.to_thread(logger.info, "Usage: %s", summary)
+
+    ctx.add_shutdown_callback(log_usage)
+
+
+# ----------------------------------------------------
+# Shared prewarm / entrypoint body
+# ----------------------------------------------------
+
+
+def prewarm(proc: JobProcess):
+    # Load models once per process, before any job is assigned to it
+    proc.userdata["vad"] = silero.VAD.load()
+    # Parse the tutor content into this process's cache too, so the first
+    # TutorAgent of a job doesn't pay the read + parse on its first reply
+    current_tutor_content()
+
+
+async def run_tutor_session(ctx: JobContext, agent: Agent, tts: murf.TTS) -> None:
+    """
+    Common entrypoint body: build the session, wire metrics, start `agent`
+    in the room and connect.
+
+    Entrypoints stay as small module-level functions in each agent file
+    (they have to be importable by the job process), and delegate here.
+    """
+    ctx.log_context_fields = {
+        "room": ctx.room.name,
+    }
+
+    # Workers started without `prewarm` load the VAD on the job instead
+    vad_model = ctx.proc.userdata.get("vad") or silero.VAD.load()
+
+    session = build_session(tts=tts, vad_model=vad_model)
+    attach_usage_metrics(session, ctx)
+
+    await session.start(
+        agent=agent,
+        room=ctx.room,
+        room_input_options=RoomInputOptions(
+            noise_cancellation=noise_cancellation.BVC(),
+        ),
+    )
+
+    await ctx.connect()
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import tutor_common
+
+CONCEPTS = [
+    {
+        "id": "variables",
+        "title": "Variables",
+        "summary": "Variables store values.",
+        "sample_question": "What is a variable?",
+    },
+    {
+        "id": "loops",
+        "title": "Loops",
+        "summary": "Loops repeat actions.",
+        "sample_question": "What is a loop?",
+    },
+]
+
+
+@pytest.fixture
+def content_file(tmp_path, monkeypatch):
+    """Point the content loader at a temp file, with an empty parse cache."""
+    path = tmp_path / "tutor_content.json"
+    monkeypatch.setattr(tutor_common, "CONTENT_PATH", path)
+    tutor_common._load_tutor_content_cached.cache_clear()
+    yield path
+    tutor_common._load_tutor_content_cached.cache_clear()
+
+
+@pytest.fixture
+def write_content(content_file):
+    """Write concepts (two by default) or raw text to the temp content file."""
+
+    def write(data=CONCEPTS) -> None:
+        content_file.write_text(data if isinstance(data, str) else json.dumps(data))
+
+    return write
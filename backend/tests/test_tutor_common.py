@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+import tutor_common
+from tutor_common import Mode, parse_mode
+
+
+def _bump_mtime(path) -> None:
+    mtime_ns = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+# ---------------- content cache ----------------
+
+
+def test_content_is_parsed_once_per_mtime(write_content) -> None:
+    write_content()
+
+    first = tutor_common.load_tutor_content()
+    assert [c["id"] for c in first] == ["variables", "loops"]
+    assert tutor_common.load_tutor_content() is first
+
+
+def test_content_cache_invalidates_on_mtime_change(content_file, write_content) -> None:
+    write_content()
+    first = tutor_common.load_tutor_content()
+
+    write_content([{"id": "variables", "title": "Variables"}])
+    _bump_mtime(content_file)
+
+    second = tutor_common.load_tutor_content()
+    assert second is not first
+    assert [c["id"] for c in second] == ["variables"]
+
+
+def test_cached_concepts_are_read_only(write_content) -> None:
+    write_content()
+    concept = tutor_common.concepts_by_id()["variables"]
+
+    with pytest.raises(TypeError):
+        concept["title"] = "Changed"
+
+
+def test_concepts_with_missing_or_non_string_fields_still_load(write_content) -> None:
+    write_content([{"id": "variables"}, {"id": 7, "title": None}, {}])
+
+    concepts = tutor_common.load_tutor_content()
+    assert len(concepts) == 3
+    assert tutor_common.concepts_by_id()[7] is concepts[1]
+    assert tutor_common.concepts_by_id()["variables"] is concepts[0]
+
+
+def test_get_concept_by_id_uses_the_given_content(write_content) -> None:
+    write_content()
+    cached = tutor_common.load_tutor_content()
+    other = [{"id": "variables", "title": "Other"}]
+
+    assert tutor_common.get_concept_by_id(cached, "loops") is cached[1]
+    assert tutor_common.get_concept_by_id(other, "variables") is other[0]
+    assert tutor_common.get_concept_by_id(other, "loops") is None
+
+
+def test_missing_file_yields_no_concepts(content_file) -> None:
+    assert tutor_common.load_tutor_content() == ()
+
+
+def test_unreadable_path_yields_no_content(
+    content_file, write_content, monkeypatch
+) -> None:
+    # stat() through a regular file raises NotADirectoryError, not FileNotFoundError
+    write_content()
+    monkeypatch.setattr(tutor_common, "CONTENT_PATH", content_file / "nested.json")
+
+    assert tutor_common.current_tutor_content() is None
+
+
+# ---------------- mode parsing ----------------
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("learn", Mode.LEARN),
+        (" Quiz ", Mode.QUIZ),
+        ("TEACH_BACK", Mode.TEACH_BACK),
+        ("intro", Mode.INTRO),
+        (Mode.LEARN, Mode.LEARN),
+    ],
+)
+def test_parse_mode(raw, expected) -> None:
+    assert parse_mode(raw) is expected
+
+
+def test_parse_mode_rejects_unknown_mode() -> None:
+    with pytest.raises(ValueError):
+        parse_mode("teach-back")
+
+
+def test_mode_formats_as_its_value() -> None:
+    assert str(Mode.TEACH_BACK) == "teach_back"
+    assert f"mode={Mode.QUIZ}" == "mode=quiz"
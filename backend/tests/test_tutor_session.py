@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import tutor_session
+from tutor_session import BufferedMetricsLogger
+
+FLUSH_INTERVAL = 0.01
+
+
+@pytest.fixture
+def logged(monkeypatch) -> list:
+    """Record what `metrics.log_metrics` is called with; "boom" raises."""
+    calls: list = []
+
+    def fake_log_metrics(m) -> None:
+        calls.append(m)
+        if m == "boom":
+            raise RuntimeError("log_metrics failed")
+
+    monkeypatch.setattr(tutor_session.metrics, "log_metrics", fake_log_metrics)
+    return calls
+
+
+def _event(m) -> SimpleNamespace:
+    # UsageCollector ignores metric types it doesn't know, so plain values work
+    return SimpleNamespace(metrics=m)
+
+
+async def _wait_for(predicate, timeout: float = 1.0) -> None:
+    async def poll() -> None:
+        while not predicate():
+            await asyncio.sleep(FLUSH_INTERVAL)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_buffered_events_are_flushed(logged) -> None:
+    buffered = BufferedMetricsLogger(flush_interval=FLUSH_INTERVAL)
+    buffered.collect(_event("a"))
+    buffered.collect(_event("b"))
+
+    # Nothing is logged inline on the event loop
+    assert logged == []
+
+    await _wait_for(lambda: logged == ["a", "b"])
+    await buffered.aclose()
+
+
+async def test_aclose_drains_buffer_and_stops_flush_task(logged) -> None:
+    # Long interval: only aclose() can flush these
+    buffered = BufferedMetricsLogger(flush_interval=60)
+    buffered.collect(_event("a"))
+    task = buffered._flush_task
+    assert task is not None
+
+    await buffered.aclose()
+
+    assert logged == ["a"]
+    assert task.done()
+
+    # Late events are logged inline and don't restart the flush loop
+    buffered.collect(_event("late"))
+    assert logged == ["a", "late"]
+    assert buffered._flush_task is None
+
+
+async def test_log_failure_does_not_stop_later_flushes(logged) -> None:
+    buffered = BufferedMetricsLogger(flush_interval=FLUSH_INTERVAL)
+    buffered.collect(_event("boom"))
+    await _wait_for(lambda: logged == ["boom"])
+
+    buffered.collect(_event("after"))
+    await _wait_for(lambda: logged == ["boom", "after"])
+
+    assert not buffered._flush_task.done()
+    await buffered.aclose()